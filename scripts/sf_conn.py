@@ -0,0 +1,97 @@
+"""
+Shared Snowflake connection helper for the migration scripts.
+"""
+import functools
+import os
+import pickle
+import tempfile
+import snowflake.connector
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import serialization
+import toml
+
+CONNECTION_NAME = "snowvation_playground"
+CONFIG_PATH = os.path.expanduser("~/.snowflake/connections.toml")
+CACHE_PATH = os.path.expanduser("~/.snowflake/.cache.pkl")
+
+def load_connection_config():
+    config = toml.load(CONFIG_PATH)
+    sf_config = config[CONNECTION_NAME]
+    
+    private_key_path = sf_config["private_key_file"]
+    if not private_key_path.startswith("/home"):
+        private_key_path = os.path.expanduser("~" + private_key_path)
+    sf_config["private_key_file"] = private_key_path
+    return sf_config
+
+@functools.lru_cache(maxsize=1)
+def load_private_key(private_key_path, mtime):
+    """Return the DER-encoded private key; mtime is part of the cache key so a rotated key is reloaded."""
+    with open(private_key_path, "rb") as f:
+        private_key = serialization.load_pem_private_key(
+            f.read(), password=None, backend=default_backend()
+        )
+    
+    return private_key.private_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+
+def load_cached_params():
+    """Return the pickled connection params if the connection, connections.toml and the key are unchanged since they were cached."""
+    try:
+        with open(CACHE_PATH, "rb") as f:
+            cache = pickle.load(f)
+        if (cache["connection_name"] == CONNECTION_NAME
+                and cache["config_path"] == CONFIG_PATH
+                and cache["config_mtime"] == os.path.getmtime(CONFIG_PATH)
+                and cache["key_mtime"] == os.path.getmtime(cache["key_path"])):
+            return cache["params"]
+    except (OSError, EOFError, KeyError, pickle.UnpicklingError):
+        pass
+    return None
+
+def save_cached_params(private_key_path, params):
+    # The cache holds the unencrypted private key, so keep it owner-only like
+    # the PEM file. mkstemp creates the file 0600 and os.replace swaps it in
+    # atomically, so concurrent readers never see a truncated cache.
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(CACHE_PATH), prefix=".cache.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump({
+                    "connection_name": CONNECTION_NAME,
+                    "config_path": CONFIG_PATH,
+                    "config_mtime": os.path.getmtime(CONFIG_PATH),
+                    "key_path": private_key_path,
+                    "key_mtime": os.path.getmtime(private_key_path),
+                    "params": params,
+                }, f)
+            os.replace(tmp_path, CACHE_PATH)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        # The cache is only an optimisation (e.g. ~/.snowflake may be a read-only mount)
+        pass
+
+def get_connection_params():
+    params = load_cached_params()
+    if params is not None:
+        return params
+    
+    sf_config = load_connection_config()
+    private_key_path = sf_config["private_key_file"]
+    params = {
+        "account": sf_config["account"],
+        "user": sf_config["user"],
+        "private_key": load_private_key(private_key_path, os.path.getmtime(private_key_path)),
+        "role": sf_config["role"],
+        "warehouse": sf_config["warehouse"],
+    }
+    save_cached_params(private_key_path, params)
+    return params
+
+def get_snowflake_connection(**connect_kwargs):
+    return snowflake.connector.connect(**get_connection_params(), **connect_kwargs)
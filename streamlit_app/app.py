@@ -3,7 +3,14 @@
 Northwind Dashboard - Streamlit Application
 Compatible with both local and Streamlit in Snowflake (SiS)
 """
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import streamlit as st
+# Internal Streamlit API (no public equivalent); used to give worker threads
+# the script-run context that st.cache_data needs
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -25,7 +32,12 @@ st.markdown("""
     .stApp {
         background-color: #f5f5f5;
     }
+    .metric-row {
+        display: flex;
+        gap: 1rem;
+    }
     .metric-card {
+        flex: 1;
         background-color: white;
         padding: 20px;
         border-radius: 5px;
@@ -54,6 +66,22 @@ st.markdown("""
 DB_SUFFIX = "478908"
 SNOWFLAKE_DATABASE = f"NORTHWIND_{DB_SUFFIX}"
 SNOWFLAKE_SCHEMA = "PUBLIC"
+FACT_TABLE = "ORDER_DETAILS_FACT"
+QUERY_TAG = "northwind-dash"
+MAX_QUERY_WORKERS = 8
+
+# Shared Plotly config: no mode bar, so charts re-render with less DOM work
+PLOTLY_CONFIG = {"displayModeBar": False, "staticPlot": False}
+
+# Northwind customer countries -> ISO-3 codes for the choropleth
+COUNTRY_TO_ISO3 = {
+    "Argentina": "ARG", "Austria": "AUT", "Belgium": "BEL", "Brazil": "BRA",
+    "Canada": "CAN", "Denmark": "DNK", "Finland": "FIN", "France": "FRA",
+    "Germany": "DEU", "Ireland": "IRL", "Italy": "ITA", "Mexico": "MEX",
+    "Norway": "NOR", "Poland": "POL", "Portugal": "PRT", "Spain": "ESP",
+    "Sweden": "SWE", "Switzerland": "CHE", "UK": "GBR", "USA": "USA",
+    "Venezuela": "VEN",
+}
 
 def is_running_in_snowflake() -> bool:
     """Detect if running inside Streamlit in Snowflake."""
@@ -69,7 +97,13 @@ def get_connection():
     """Get Snowflake connection - works locally and in SiS."""
     if is_running_in_snowflake():
         from snowflake.snowpark.context import get_active_session
-        return get_active_session()
+        session = get_active_session()
+        try:
+            session.query_tag = QUERY_TAG
+        except Exception as e:
+            # The tag is only for observability; never fail the app over it
+            logging.getLogger(__name__).warning("Could not set query tag: %s", e)
+        return session
     else:
         import snowflake.connector
         from cryptography.hazmat.backends import default_backend
@@ -77,6 +111,10 @@ def get_connection():
         import toml
         import os
         
+        # Server-side qmark binding keeps query text stable across filter
+        # values, so repeated queries can hit Snowflake's result cache
+        snowflake.connector.paramstyle = "qmark"
+        
         config_path = os.path.expanduser("~/.snowflake/connections.toml")
         config = toml.load(config_path)
         sf_config = config["snowvation_playground"]
@@ -102,16 +140,30 @@ def get_connection():
             role=sf_config["role"],
             warehouse=sf_config["warehouse"],
             database=SNOWFLAKE_DATABASE,
-            schema="PUBLIC"
+            schema="PUBLIC",
+            # Session settings ride along with the login request instead of
+            # costing an ALTER SESSION round-trip later
+            session_parameters={
+                "QUERY_TAG": QUERY_TAG,
+                "USE_CACHED_RESULT": True,
+                "CLIENT_RESULT_CHUNK_SIZE": 160,
+            },
+            client_prefetch_threads=8
         )
 
-def query_to_df(query: str) -> pd.DataFrame:
+def query_to_df(query: str, params: tuple = ()) -> pd.DataFrame:
     """Execute query and return DataFrame - works in both environments."""
     conn = get_connection()
     if is_running_in_snowflake():
-        return conn.sql(query).to_pandas()
+        return conn.sql(query, params=list(params)).to_pandas()
     else:
-        return pd.read_sql(query, conn)
+        # Arrow result batches decode straight into typed pandas columns
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            return cursor.fetch_pandas_all()
+        finally:
+            cursor.close()
 
 def get_table_ref(table_name: str) -> str:
     """Get fully qualified table reference for SiS compatibility."""
@@ -119,59 +171,136 @@ def get_table_ref(table_name: str) -> str:
         return f"{SNOWFLAKE_DATABASE}.{SNOWFLAKE_SCHEMA}.{table_name}"
     return table_name
 
-@st.cache_data(ttl=300)
-def load_data():
-    """Load data from Snowflake."""
-    view_ref = get_table_ref("ORDER_DETAILS_VIEW")
-    query = f"SELECT * FROM {view_ref}"
-    df = query_to_df(query)
+@st.cache_data(ttl=300, show_spinner=False)
+def run_query(query: str, params: tuple = ()) -> pd.DataFrame:
+    """Run a query and cache its (small) result keyed on SQL text and parameters."""
+    df = query_to_df(query, params)
     df.columns = df.columns.str.lower()
+    return df
+
+def filter_clause(filters):
+    """Translate sidebar filters into a WHERE clause and its qmark parameters."""
+    clauses = []
+    params = []
+    for key, column in [
+        ("category", "CATEGORY_NAME"),
+        ("product", "PRODUCT_NAME"),
+        ("country", "CUSTOMER_COUNTRY"),
+        ("employee", "EMPLOYEE_NAME"),
+    ]:
+        if filters[key] != "All":
+            clauses.append(f"{column} = ?")
+            params.append(filters[key])
     
-    for col in ["order_date", "shipped_date", "hire_date"]:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col])
+    if len(filters["date_range"]) == 2:
+        start_date, end_date = filters["date_range"]
+        clauses.append("ORDER_DATE BETWEEN ? AND ?")
+        params.extend([start_date.isoformat(), end_date.isoformat()])
     
-    return df
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, tuple(params)
 
-@st.cache_data(ttl=300)
-def load_products():
-    """Load products data."""
-    view_ref = get_table_ref("PRODUCT_VIEW")
-    query = f"SELECT * FROM {view_ref}"
-    df = query_to_df(query)
-    df.columns = df.columns.str.lower()
-    return df
+def aggregate(select_sql, filters, tail=""):
+    """Aggregate ORDER_DETAILS_FACT in Snowflake, restricted by the sidebar filters."""
+    where, params = filter_clause(filters)
+    query = f"SELECT {select_sql} FROM {get_table_ref(FACT_TABLE)} {where} {tail}"
+    return run_query(query, params)
+
+def run_concurrently(**queries):
+    """Run independent query callables in parallel and return their results by name."""
+    # Open (or reuse) the cached connection on the script thread first
+    get_connection()
+    if is_running_in_snowflake():
+        # The shared Snowpark session is only thread-safe from snowpark 1.24,
+        # which the SiS environment does not guarantee, so run in order there
+        return {name: query() for name, query in queries.items()}
+    ctx = get_script_run_ctx()
+    max_workers = min(len(queries), MAX_QUERY_WORKERS)
+    with ThreadPoolExecutor(max_workers=max_workers, initializer=add_script_run_ctx, initargs=(None, ctx)) as executor:
+        futures = {name: executor.submit(query) for name, query in queries.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+def top_by_orders(column, filters, n=5, ascending=False):
+    """Return the n values of column with the most (or fewest) distinct orders."""
+    direction = "ASC" if ascending else "DESC"
+    return aggregate(
+        f"{column}, COUNT(DISTINCT ORDER_ID) AS orders", filters,
+        f"GROUP BY 1 ORDER BY orders {direction}, 1 LIMIT {n}"
+    )
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_filter_options():
+    """Load the sidebar choices and order date bounds in one query."""
+    options = run_query(f"""
+        SELECT MIN(ORDER_DATE) AS min_date, MAX(ORDER_DATE) AS max_date,
+               ARRAY_AGG(DISTINCT CATEGORY_NAME) AS categories,
+               ARRAY_AGG(DISTINCT PRODUCT_NAME) AS products,
+               ARRAY_AGG(DISTINCT CUSTOMER_COUNTRY) AS countries,
+               ARRAY_AGG(DISTINCT EMPLOYEE_NAME) AS employees
+        FROM {get_table_ref(FACT_TABLE)}
+    """).iloc[0]
+    return {
+        "min_date": pd.Timestamp(options["min_date"]).date(),
+        "max_date": pd.Timestamp(options["max_date"]).date(),
+        "categories": sorted(json.loads(options["categories"])),
+        "products": sorted(json.loads(options["products"])),
+        "countries": sorted(json.loads(options["countries"])),
+        "employees": sorted(json.loads(options["employees"])),
+    }
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_category_products():
+    """Load a mapping of each category to its sorted product names."""
+    products = run_query(f"""
+        SELECT CATEGORY_NAME AS category, ARRAY_AGG(DISTINCT PRODUCT_NAME) AS products
+        FROM {get_table_ref(FACT_TABLE)}
+        WHERE CATEGORY_NAME IS NOT NULL
+        GROUP BY 1
+    """)
+    return {
+        row.category: sorted(json.loads(row.products))
+        for row in products.itertuples(index=False)
+    }
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_stock_by_category():
+    """Load stock totals per category; stock changes slowly, so cache longer."""
+    return run_query(f"SELECT * FROM {get_table_ref('STOCK_BY_CATEGORY')} ORDER BY 1")
+
+# (suffix, divisor) for each magnitude bucket used by format_number
+NUMBER_SUFFIXES = [("", 1), ("K", 1_000), ("M", 1_000_000)]
 
 def format_number(num, prefix=""):
     """Format numbers with K/M suffix."""
-    if num >= 1_000_000:
-        return f"{prefix}{num/1_000_000:.1f}M"
-    elif num >= 1_000:
-        return f"{prefix}{num/1_000:.1f}K"
-    else:
-        return f"{prefix}{num:.0f}"
+    bucket = 2 if num >= 1_000_000 else (1 if num >= 1_000 else 0)
+    suffix, divisor = NUMBER_SUFFIXES[bucket]
+    return f"{prefix}{num/divisor:.1f}{suffix}" if bucket else f"{prefix}{num:.0f}"
+
+def add_totals_row(df):
+    """Append a "Total" row in place; the first column holds the row labels."""
+    df.loc[len(df)] = ["Total"] + df.iloc[:, 1:].sum().tolist()
 
-def render_sidebar_filters(df):
+def render_sidebar_filters(options):
     """Render sidebar filters."""
     st.sidebar.markdown("### Filters")
     
-    categories = ["All"] + sorted(df["category_name"].dropna().unique().tolist())
+    categories = ["All"] + options["categories"]
     selected_category = st.sidebar.selectbox("Category Name", categories)
     
     if selected_category != "All":
-        products = ["All"] + sorted(df[df["category_name"] == selected_category]["product_name"].dropna().unique().tolist())
+        products = ["All"] + load_category_products().get(selected_category, [])
     else:
-        products = ["All"] + sorted(df["product_name"].dropna().unique().tolist())
+        products = ["All"] + options["products"]
     selected_product = st.sidebar.selectbox("Product Name", products)
     
-    countries = ["All"] + sorted(df["customer_country"].dropna().unique().tolist())
+    countries = ["All"] + options["countries"]
     selected_country = st.sidebar.selectbox("Country", countries)
     
-    employees = ["All"] + sorted(df["employee_name"].dropna().unique().tolist())
+    employees = ["All"] + options["employees"]
     selected_employee = st.sidebar.selectbox("Employee Name", employees)
     
-    min_date = df["order_date"].min().date()
-    max_date = df["order_date"].max().date()
+    min_date = options["min_date"]
+    max_date = options["max_date"]
     date_range = st.sidebar.date_input(
         "Order Date Range",
         value=(min_date, max_date),
@@ -187,68 +316,60 @@ def render_sidebar_filters(df):
         "date_range": date_range
     }
 
-def apply_filters(df, filters):
-    """Apply filters to dataframe."""
-    filtered = df.copy()
-    
-    if filters["category"] != "All":
-        filtered = filtered[filtered["category_name"] == filters["category"]]
-    
-    if filters["product"] != "All":
-        filtered = filtered[filtered["product_name"] == filters["product"]]
-    
-    if filters["country"] != "All":
-        filtered = filtered[filtered["customer_country"] == filters["country"]]
-    
-    if filters["employee"] != "All":
-        filtered = filtered[filtered["employee_name"] == filters["employee"]]
-    
-    if len(filters["date_range"]) == 2:
-        start_date, end_date = filters["date_range"]
-        filtered = filtered[
-            (filtered["order_date"].dt.date >= start_date) &
-            (filtered["order_date"].dt.date <= end_date)
-        ]
-    
-    return filtered
-
-def overview_page(df, filters):
+def overview_page(filters):
     """Render Overview page."""
-    filtered = apply_filters(df, filters)
-    
-    col1, col2, col3, col4, col5, col6 = st.columns(6)
-    
-    gross_revenue = filtered["gross_revenue"].sum()
-    discount = filtered["discount_amount"].sum()
-    net_revenue = filtered["net_revenue"].sum()
-    orders = filtered["order_id"].nunique()
-    quantity = filtered["quantity"].sum()
-    avg_days_ship = filtered["days_to_ship"].mean() if not filtered["days_to_ship"].isna().all() else 0
-    
-    with col1:
-        st.metric("Sum of Gross Revenue", format_number(gross_revenue))
-    with col2:
-        st.metric("Sum of Discount ($)", format_number(discount))
-    with col3:
-        st.metric("Sum of Net Revenue", format_number(net_revenue))
-    with col4:
-        st.metric("Orders", f"{orders:,}")
-    with col5:
-        st.metric("Sum of Quantity", format_number(quantity))
-    with col6:
-        st.metric("Avg Days to Ship", f"{avg_days_ship:.2f}")
+    results = run_concurrently(
+        kpis=partial(aggregate, """
+            SUM(GROSS_REVENUE) AS gross_revenue,
+            SUM(DISCOUNT_AMOUNT) AS discount,
+            SUM(NET_REVENUE) AS net_revenue,
+            COUNT(DISTINCT ORDER_ID) AS orders,
+            SUM(QUANTITY) AS quantity,
+            AVG(DAYS_TO_SHIP) AS avg_days_ship
+        """, filters),
+        country_revenue=partial(
+            aggregate, "CUSTOMER_COUNTRY, SUM(NET_REVENUE) AS net_revenue", filters, "GROUP BY 1"
+        ),
+        monthly=partial(aggregate, """
+            TO_CHAR(ORDER_MONTH, 'YYYY-MM') AS month_label,
+            COUNT(DISTINCT ORDER_ID) AS orders,
+            SUM(GROSS_REVENUE) AS gross_revenue
+        """, filters, "GROUP BY ORDER_MONTH ORDER BY ORDER_MONTH"),
+        shipping=partial(
+            aggregate, "SHIPPING_COMPANY, AVG(DAYS_TO_SHIP) AS days_to_ship", filters, "GROUP BY 1 ORDER BY 2"
+        ),
+    )
+    kpis = results["kpis"].fillna(0).iloc[0]
+    
+    metrics = [
+        ("Sum of Gross Revenue", format_number(kpis["gross_revenue"])),
+        ("Sum of Discount ($)", format_number(kpis["discount"])),
+        ("Sum of Net Revenue", format_number(kpis["net_revenue"])),
+        ("Orders", f"{int(kpis['orders']):,}"),
+        ("Sum of Quantity", format_number(kpis["quantity"])),
+        ("Avg Days to Ship", f"{kpis['avg_days_ship']:.2f}"),
+    ]
+    # One markdown element for all six cards instead of six st.metric widgets
+    cards = "".join(
+        f'<div class="metric-card"><div class="metric-value">{value}</div>'
+        f'<div class="metric-label">{label}</div></div>'
+        for label, value in metrics
+    )
+    st.markdown(f'<div class="metric-row">{cards}</div>', unsafe_allow_html=True)
     
     st.markdown("---")
     
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("<div class="section-header">Net Revenue by Country and City</div>", unsafe_allow_html=True)
-        country_revenue = filtered.groupby("customer_country")["net_revenue"].sum().reset_index()
+        st.markdown('<div class="section-header">Net Revenue by Country and City</div>', unsafe_allow_html=True)
+        country_revenue = results["country_revenue"]
+        country_revenue["iso3"] = country_revenue["customer_country"].map(COUNTRY_TO_ISO3)
         fig = px.choropleth(
             country_revenue,
-            locations="customer_country",
-            locationmode="country names",
+            locations="iso3",
+            locationmode="ISO-3",
+            hover_name="customer_country",
             color="net_revenue",
             color_continuous_scale="Blues",
             title=""
@@ -256,28 +377,26 @@ def overview_page(df, filters):
         fig.update_layout(
             geo=dict(showframe=False, showcoastlines=True),
             margin=dict(l=0, r=0, t=0, b=0),
-            height=400
+            height=400,
+            uirevision="geo"
         )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
     
     with col2:
-        st.markdown("<div class="section-header">Total Orders Vs Gross Revenue by Month</div>", unsafe_allow_html=True)
-        monthly = filtered.groupby(filtered["order_date"].dt.to_period("M")).agg({
-            "order_id": "nunique",
-            "gross_revenue": "sum"
-        }).reset_index()
-        monthly["order_date"] = monthly["order_date"].astype(str)
+        st.markdown('<div class="section-header">Total Orders Vs Gross Revenue by Month</div>', unsafe_allow_html=True)
+        monthly = results["monthly"]
         
         fig = go.Figure()
         fig.add_trace(go.Bar(
-            x=monthly["order_date"],
+            x=monthly["month_label"],
             y=monthly["gross_revenue"],
             name="Gross Revenue",
-            marker_color="#2e75b6"
+            marker_color="#2e75b6",
+            marker_line_width=0
         ))
-        fig.add_trace(go.Scatter(
-            x=monthly["order_date"],
-            y=monthly["order_id"] * 1000,
+        fig.add_trace(go.Scattergl(
+            x=monthly["month_label"],
+            y=monthly["orders"] * 1000,
             name="Orders",
             mode="lines+markers",
             yaxis="y2",
@@ -288,13 +407,14 @@ def overview_page(df, filters):
             yaxis2=dict(title="Orders", overlaying="y", side="right"),
             legend=dict(orientation="h", yanchor="bottom", y=1.02),
             height=400,
-            margin=dict(l=50, r=50, t=30, b=50)
+            margin=dict(l=50, r=50, t=30, b=50),
+            uirevision="keep",
+            hovermode="x"
         )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
     
-    st.markdown("<div class="section-header">Average Days to Ship by Shipping Company</div>", unsafe_allow_html=True)
-    shipping = filtered.groupby("shipping_company")["days_to_ship"].mean().reset_index()
-    shipping = shipping.sort_values("days_to_ship", ascending=True)
+    st.markdown('<div class="section-header">Average Days to Ship by Shipping Company</div>', unsafe_allow_html=True)
+    shipping = results["shipping"]
     
     fig = px.bar(
         shipping,
@@ -307,79 +427,82 @@ def overview_page(df, filters):
         xaxis_title="Average Days to Ship",
         yaxis_title="",
         height=250,
-        margin=dict(l=150, r=50, t=30, b=50)
+        margin=dict(l=150, r=50, t=30, b=50),
+        uirevision="keep",
+        hovermode=False
     )
     fig.update_traces(texttemplate="%{x:.2f}", textposition="outside")
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
 
-def category_product_page(df, filters):
+# Orders, quantity and revenue columns shared by the performance tables
+PERFORMANCE_SQL = """
+    COUNT(DISTINCT ORDER_ID) AS orders,
+    SUM(QUANTITY) AS quantity,
+    SUM(GROSS_REVENUE) AS gross_revenue,
+    SUM(DISCOUNT_AMOUNT) AS discount_amount,
+    SUM(NET_REVENUE) AS net_revenue
+"""
+
+def category_product_page(filters):
     """Render Category and Product page."""
-    filtered = apply_filters(df, filters)
-    products_df = load_products()
+    results = run_concurrently(
+        top5=partial(top_by_orders, "PRODUCT_NAME", filters),
+        bottom5=partial(top_by_orders, "PRODUCT_NAME", filters, ascending=True),
+        category_perf=partial(aggregate, f"CATEGORY_NAME, {PERFORMANCE_SQL}", filters, "GROUP BY 1 ORDER BY 1"),
+        stock=load_stock_by_category,
+    )
+    stock_by_category = results["stock"]
     
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("<div class="section-header">Top/Bottom 5 Products by Orders</div>", unsafe_allow_html=True)
-        
-        product_orders = filtered.groupby("product_name")["order_id"].nunique().reset_index()
-        product_orders.columns = ["Product Name", "Orders"]
-        
-        st.markdown("**Top 5 Products by order**")
-        top5 = product_orders.nlargest(5, "Orders")
+        st.markdown(
+            '<div class="section-header">Top/Bottom 5 Products by Orders</div>\n\n**Top 5 Products by order**',
+            unsafe_allow_html=True
+        )
+        top5 = results["top5"]
+        top5.columns = ["Product Name", "Orders"]
         fig = px.bar(top5, x="Orders", y="Product Name", orientation="h", color_discrete_sequence=["#70ad47"])
-        fig.update_layout(height=200, margin=dict(l=150, r=30, t=10, b=30), yaxis=dict(autorange="reversed"))
+        fig.update_layout(height=200, margin=dict(l=150, r=30, t=10, b=30), yaxis=dict(autorange="reversed"),
+                          uirevision="keep", hovermode=False)
         fig.update_traces(texttemplate="%{x}", textposition="outside")
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
         
         st.markdown("**Bottom 5 Products by order**")
-        bottom5 = product_orders.nsmallest(5, "Orders")
+        bottom5 = results["bottom5"]
+        bottom5.columns = ["Product Name", "Orders"]
         fig = px.bar(bottom5, x="Orders", y="Product Name", orientation="h", color_discrete_sequence=["#ed7d31"])
-        fig.update_layout(height=200, margin=dict(l=150, r=30, t=10, b=30))
+        fig.update_layout(height=200, margin=dict(l=150, r=30, t=10, b=30), uirevision="keep", hovermode=False)
         fig.update_traces(texttemplate="%{x}", textposition="outside")
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
     
     with col2:
-        st.markdown("<div class="section-header">Category and Product level Performance</div>", unsafe_allow_html=True)
+        st.markdown('<div class="section-header">Category and Product level Performance</div>', unsafe_allow_html=True)
         
-        category_perf = filtered.groupby("category_name").agg({
-            "order_id": "nunique",
-            "quantity": "sum",
-            "gross_revenue": "sum",
-            "discount_amount": "sum",
-            "net_revenue": "sum"
-        }).reset_index()
+        category_perf = results["category_perf"]
         category_perf.columns = ["Category Name", "Orders", "Quantity", "Gross Revenue", "Discount ($)", "Net Revenue"]
         
-        totals = category_perf.sum(numeric_only=True)
-        totals["Category Name"] = "Total"
-        category_perf = pd.concat([category_perf, pd.DataFrame([totals])], ignore_index=True)
+        add_totals_row(category_perf)
         
         st.dataframe(category_perf, use_container_width=True, height=400)
     
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("<div class="section-header">Unit in Stock and Unit on Order</div>", unsafe_allow_html=True)
+        st.markdown('<div class="section-header">Unit in Stock and Unit on Order</div>', unsafe_allow_html=True)
         
-        stock_data = products_df.groupby("category_name").agg({
-            "units_in_stock": "sum",
-            "units_on_order": "sum"
-        }).reset_index()
+        stock_data = stock_by_category.copy()
         stock_data.columns = ["Category Name", "Units In Stock", "Units On Order"]
         
-        totals = stock_data.sum(numeric_only=True)
-        totals["Category Name"] = "Total"
-        stock_data = pd.concat([stock_data, pd.DataFrame([totals])], ignore_index=True)
+        add_totals_row(stock_data)
         
         st.dataframe(stock_data, use_container_width=True, height=300)
     
     with col2:
-        st.markdown("<div class="section-header">Unit in Stock by Category and Product</div>", unsafe_allow_html=True)
+        st.markdown('<div class="section-header">Unit in Stock by Category and Product</div>', unsafe_allow_html=True)
         
-        category_stock = products_df.groupby("category_name")["units_in_stock"].sum().reset_index()
         fig = px.bar(
-            category_stock,
+            stock_by_category,
             x="category_name",
             y="units_in_stock",
             color_discrete_sequence=["#2e75b6"]
@@ -388,85 +511,82 @@ def category_product_page(df, filters):
             xaxis_title="Category Name",
             yaxis_title="Units In Stock",
             height=300,
-            margin=dict(l=50, r=50, t=30, b=100)
+            margin=dict(l=50, r=50, t=30, b=100),
+            uirevision="keep",
+            hovermode=False
         )
         fig.update_traces(texttemplate="%{y}", textposition="outside")
         fig.update_xaxes(tickangle=45)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
 
-def employees_page(df, filters):
+def employees_page(filters):
     """Render Employees page."""
-    filtered = apply_filters(df, filters)
+    results = run_concurrently(
+        emp_revenue=partial(aggregate, """
+            EMPLOYEE_NAME,
+            COUNT(DISTINCT ORDER_ID) AS orders,
+            SUM(NET_REVENUE) AS net_revenue
+        """, filters, "GROUP BY 1"),
+        title_perf=partial(aggregate, f"EMPLOYEE_TITLE, {PERFORMANCE_SQL}", filters, "GROUP BY 1 ORDER BY 1"),
+    )
+    emp_revenue = results["emp_revenue"]
     
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("<div class="section-header">Top/Bottom 5 Employees by Orders</div>", unsafe_allow_html=True)
-        
-        emp_orders = filtered.groupby("employee_name")["order_id"].nunique().reset_index()
-        emp_orders.columns = ["Employee Name", "Orders"]
+        st.markdown(
+            '<div class="section-header">Top/Bottom 5 Employees by Orders</div>\n\n**Top 5 Employees by order**',
+            unsafe_allow_html=True
+        )
         
-        st.markdown("**Top 5 Employees by order**")
+        emp_orders = emp_revenue.rename(columns={"employee_name": "Employee Name", "orders": "Orders"})
         top5 = emp_orders.nlargest(5, "Orders")
         fig = px.bar(top5, x="Orders", y="Employee Name", orientation="h", color_discrete_sequence=["#70ad47"])
-        fig.update_layout(height=200, margin=dict(l=100, r=30, t=10, b=30), yaxis=dict(autorange="reversed"))
+        fig.update_layout(height=200, margin=dict(l=100, r=30, t=10, b=30), yaxis=dict(autorange="reversed"),
+                          uirevision="keep", hovermode=False)
         fig.update_traces(texttemplate="%{x}", textposition="outside")
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
         
         st.markdown("**Bottom 5 Employees by orders**")
         bottom5 = emp_orders.nsmallest(5, "Orders")
         fig = px.bar(bottom5, x="Orders", y="Employee Name", orientation="h", color_discrete_sequence=["#ed7d31"])
-        fig.update_layout(height=200, margin=dict(l=100, r=30, t=10, b=30))
+        fig.update_layout(height=200, margin=dict(l=100, r=30, t=10, b=30), uirevision="keep", hovermode=False)
         fig.update_traces(texttemplate="%{x}", textposition="outside")
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
     
     with col2:
-        st.markdown("<div class="section-header">Title and Employee level Performance</div>", unsafe_allow_html=True)
+        st.markdown('<div class="section-header">Title and Employee level Performance</div>', unsafe_allow_html=True)
         
-        title_perf = filtered.groupby("employee_title").agg({
-            "order_id": "nunique",
-            "quantity": "sum",
-            "gross_revenue": "sum",
-            "discount_amount": "sum",
-            "net_revenue": "sum"
-        }).reset_index()
+        title_perf = results["title_perf"]
         title_perf.columns = ["Title", "Orders", "Quantity", "Gross Revenue", "Discount ($)", "Net Revenue"]
+        title_revenue = title_perf[["Title", "Net Revenue"]].sort_values("Net Revenue")
         
-        totals = title_perf.sum(numeric_only=True)
-        totals["Title"] = "Total"
-        title_perf = pd.concat([title_perf, pd.DataFrame([totals])], ignore_index=True)
+        add_totals_row(title_perf)
         
         st.dataframe(title_perf, use_container_width=True, height=300)
     
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("<div class="section-header">Net Revenue by Employee Title</div>", unsafe_allow_html=True)
-        
-        title_revenue = filtered.groupby("employee_title")["net_revenue"].sum().reset_index()
-        title_revenue = title_revenue.sort_values("net_revenue")
+        st.markdown('<div class="section-header">Net Revenue by Employee Title</div>', unsafe_allow_html=True)
         
         fig = go.Figure(go.Waterfall(
             orientation="v",
-            x=title_revenue["employee_title"].tolist() + ["Total"],
-            y=title_revenue["net_revenue"].tolist() + [title_revenue["net_revenue"].sum()],
+            x=title_revenue["Title"].tolist() + ["Total"],
+            y=title_revenue["Net Revenue"].tolist() + [title_revenue["Net Revenue"].sum()],
             connector={"line": {"color": "rgb(63, 63, 63)"}},
             increasing={"marker": {"color": "#70ad47"}},
             decreasing={"marker": {"color": "#ed7d31"}},
             totals={"marker": {"color": "#2e75b6"}}
         ))
-        fig.update_layout(height=300, margin=dict(l=50, r=50, t=30, b=100))
+        fig.update_layout(height=300, margin=dict(l=50, r=50, t=30, b=100), uirevision="keep")
         fig.update_xaxes(tickangle=45)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
     
     with col2:
-        st.markdown("<div class="section-header">Net Revenue per order by Employee</div>", unsafe_allow_html=True)
+        st.markdown('<div class="section-header">Net Revenue per order by Employee</div>', unsafe_allow_html=True)
         
-        emp_revenue = filtered.groupby("employee_name").agg({
-            "order_id": "nunique",
-            "net_revenue": "sum"
-        }).reset_index()
-        emp_revenue["revenue_per_order"] = emp_revenue["net_revenue"] / emp_revenue["order_id"]
+        emp_revenue = emp_revenue.assign(revenue_per_order=emp_revenue["net_revenue"] / emp_revenue["orders"])
         emp_revenue = emp_revenue.sort_values("revenue_per_order", ascending=False)
         
         fig = px.bar(
@@ -479,11 +599,13 @@ def employees_page(df, filters):
             xaxis_title="Employee Name",
             yaxis_title="Net Revenue per order",
             height=300,
-            margin=dict(l=50, r=50, t=30, b=100)
+            margin=dict(l=50, r=50, t=30, b=100),
+            uirevision="keep",
+            hovermode=False
         )
         fig.update_traces(texttemplate="%{y:.0f}", textposition="outside")
         fig.update_xaxes(tickangle=45)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
 
 def main():
     st.markdown("""
@@ -494,7 +616,7 @@ def main():
     """, unsafe_allow_html=True)
     
     try:
-        df = load_data()
+        options = load_filter_options()
     except Exception as e:
         st.error(f"Error loading data: {e}")
         st.info("Please run the migration script first: python scripts/migrate_to_snowflake.py")
@@ -507,14 +629,14 @@ def main():
         label_visibility="collapsed"
     )
     
-    filters = render_sidebar_filters(df)
+    filters = render_sidebar_filters(options)
     
     if page == "Overview":
-        overview_page(df, filters)
+        overview_page(filters)
     elif page == "Category and Product":
-        category_product_page(df, filters)
+        category_product_page(filters)
     else:
-        employees_page(df, filters)
+        employees_page(filters)
 
 if __name__ == "__main__":
     main()